@@ -1,7 +1,7 @@
-import os
 from datetime import date, datetime
 import asyncio
-from typing import List
+import threading
+from typing import List, Optional
 
 from fastapi import FastAPI, BackgroundTasks
 
@@ -10,36 +10,86 @@ from apscheduler.triggers.cron import CronTrigger
 import httpx
 
 from datetime import datetime
-from pydantic import BaseModel
 import uvicorn
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
-from dotenv import load_dotenv
-
-load_dotenv()  # take environment variables from .env.
+# Settings read .env themselves, see config.py
+from .config import settings
 
 # Import the existing quiz generation logic
-from .quiz_generator import generate_news, generate_ai_news_quiz, QuizQuestion, generate_news_scrape
-
-# Environment Configuration
-class Settings(BaseModel):
-    OPENAI_API_KEY: str = os.getenv('OPENAI_API_KEY')
-    PERPLEXITY_API_KEY: str = os.getenv('PERPLEXITY_API_KEY')
-    SUPABASE_URL: str = os.getenv('SUPABASE_URL_BF')
-    SUPABASE_KEY: str = os.getenv('SUPABASE_KEY_BF')
-    SMTP_HOST: str = os.getenv('SMTP_HOST', 'smtp.gmail.com')
-    SMTP_PORT: int = int(os.getenv('SMTP_PORT', 587))
-    SMTP_USERNAME: str = os.getenv('SMTP_USERNAME')
-    SMTP_PASSWORD: str = os.getenv('SMTP_PASSWORD')
-    NOTIFICATION_EMAIL: str = os.getenv('NOTIFICATION_EMAIL')
-
-settings = Settings()
+from .quiz_generator import generate_news, generate_ai_news_quiz, insert_quiz_questions, QuizQuestion, generate_news_scrape
 
 app = FastAPI()
 scheduler = AsyncIOScheduler()
 
+class SMTPPool:
+    """
+    Keep a single authenticated SMTP connection open and reuse it across notifications
+    """
+    def __init__(self, host: str, port: int, username: str, password: str):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self._server: Optional[smtplib.SMTP] = None
+        # send() runs in worker threads, so the shared connection needs guarding
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            server.starttls()  # Enable security
+            server.login(self.username, self.password)
+        except Exception:
+            # Don't leak the half-open socket when the handshake or login fails
+            server.close()
+            raise
+        return server
+
+    def _get_server(self) -> smtplib.SMTP:
+        if self._server is not None:
+            try:
+                # Make sure the pooled connection is still alive
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except smtplib.SMTPException:
+                pass
+            self._close()
+        self._server = self._connect()
+        return self._server
+
+    def send(self, msg):
+        with self._lock:
+            try:
+                self._get_server().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Connection dropped between the health check and the send, retry once
+                self._close()
+                self._get_server().send_message(msg)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except smtplib.SMTPException:
+            pass
+        finally:
+            self._server = None
+
+smtp_pool = SMTPPool(
+    settings.SMTP_HOST,
+    settings.SMTP_PORT,
+    settings.SMTP_USERNAME,
+    settings.SMTP_PASSWORD
+)
+
 async def send_email_notification(subject: str, body: str):
     """
     Send email notification about quiz generation status
@@ -54,11 +104,8 @@ async def send_email_notification(subject: str, body: str):
         # Attach body to email
         msg.attach(MIMEText(body, 'plain'))
 
-        # Create SMTP session
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()  # Enable security
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
+        # Send over the pooled SMTP session in a worker thread so the event loop is not blocked
+        await asyncio.to_thread(smtp_pool.send, msg)
         
         print("Email notification sent successfully")
     except Exception as e:
@@ -76,16 +123,14 @@ async def generate_daily_quiz():
         #     perplexity_api_key=settings.PERPLEXITY_API_KEY
         # )
 
-        news_content = generate_news_scrape()
+        # The shared client only exists once startup has run; otherwise scrape with a one-off client
+        news_content = await generate_news_scrape(getattr(app.state, "http_client", None))
         
         if news_content:
             print("News generated")
-        generated_quiz = generate_ai_news_quiz(
+        generated_quiz = await generate_ai_news_quiz(
             news_content, 
-            num_questions=20,
-            openai_api_key=settings.OPENAI_API_KEY,
-            supabase_url=settings.SUPABASE_URL,
-            supabase_key=settings.SUPABASE_KEY
+            num_questions=20
         )
         if generated_quiz:
             print("Quiz generated")
@@ -102,11 +147,24 @@ async def generate_daily_quiz():
         {news_content}
         """
         
-        # Send success/failure notification
-        await send_email_notification(
-            "Daily AI News Quiz Generation Report", 
-            email_body
-        )
+        # Push to Supabase and send the success/failure notification concurrently
+        tasks = [
+            asyncio.create_task(send_email_notification(
+                "Daily AI News Quiz Generation Report", 
+                email_body
+            ))
+        ]
+        if generated_quiz:
+            tasks.append(asyncio.create_task(insert_quiz_questions(
+                generated_quiz,
+                news_content
+            )))
+        # The report may already be sent, so an insert failure must not bubble up
+        # into the error notification below
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Failed to insert quiz questions: {result}")
         
         return generated_quiz
     except Exception as e:
@@ -118,7 +176,7 @@ async def generate_daily_quiz():
         return []
 
 @app.post("/generate-quiz")
-async def trigger_quiz_generation(background_tasks: BackgroundTasks):
+async def trigger_quiz_generation_route(background_tasks: BackgroundTasks):
     """
     Endpoint to trigger quiz generation
     """
@@ -128,20 +186,31 @@ async def trigger_quiz_generation(background_tasks: BackgroundTasks):
         "message": "Quiz will be generated and pushed to database"
     }
 
-async def trigger_quiz_generation():
-    async with httpx.AsyncClient() as client:
-        response = await client.post("http://buildfast-dailyquiz/generate-quiz")
-        print(f"Quiz generation triggered. Response: {response.text}")
-
 # Schedule the quiz generation to run daily at 1:00 AM
-scheduler.add_job(trigger_quiz_generation, CronTrigger.from_crontab("0 1 * * *"))
+# At most one run at a time; missed firings collapse into a single run
+scheduler.add_job(
+    generate_daily_quiz,
+    CronTrigger.from_crontab("0 1 * * *"),
+    id="daily_quiz",
+    max_instances=1,
+    coalesce=True,
+    misfire_grace_time=3600,
+    replace_existing=True
+)
 
 @app.on_event("startup")
 async def startup_event():
+    # Shared HTTP client so scheduled runs keep connections alive between scrapes
+    app.state.http_client = httpx.AsyncClient(
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    )
     scheduler.start()
 @app.on_event("shutdown")
 async def shutdown_event():
     scheduler.shutdown()
+    await app.state.http_client.aclose()
+    await asyncio.to_thread(smtp_pool.close)
 
 
 @app.get("/")
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+# Environment Configuration, read and validated once at import
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+    OPENAI_API_KEY: Optional[str] = None
+    PERPLEXITY_API_KEY: Optional[str] = None
+    SUPABASE_URL: Optional[str] = Field(default=None, validation_alias="SUPABASE_URL_BF")
+    SUPABASE_KEY: Optional[str] = Field(default=None, validation_alias="SUPABASE_KEY_BF")
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    NOTIFICATION_EMAIL: Optional[str] = None
+
+settings = Settings()
@@ -1,17 +1,20 @@
+import asyncio
 import random
-import os
 import uuid
 from datetime import date
 from typing import List, Optional, Dict, Any, Union
-import requests
-from bs4 import BeautifulSoup
-from supabase import create_client, Client
+import httpx
+from selectolax.parser import HTMLParser
+from supabase import acreate_client, AsyncClient
+from postgrest.exceptions import APIError
 
 from pydantic import BaseModel, Field, ConfigDict
 from langchain_openai import ChatOpenAI
 from langchain.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 
+from .config import settings
+
 
 class Option(BaseModel):
     text: str = Field(description="The text of the option.")
@@ -33,35 +36,44 @@ class QuizQuestionList(BaseModel):
         questions: List[QuizQuestion]
 
 
-# NEWS DATA GENERATION: Webscraping (Beautiful Soup)
+# NEWS DATA GENERATION: Webscraping (selectolax)
+
+# Browser-like User-Agent; httpx already negotiates gzip/deflate on its own
+SCRAPE_HEADERS = {
+    "User-Agent": "Mozilla/5.0"
+}
 
-def generate_news_scrape():
+async def generate_news_scrape(client: Optional[httpx.AsyncClient] = None):
     # URL of the news page
     url = "https://economictimes.indiatimes.com/tech/artificial-intelligence"
 
-    # Make a GET request to fetch the raw HTML content
-    response = requests.get(url)
+    # Make a GET request to fetch the raw HTML content without blocking the event loop,
+    # reusing the caller's pooled client so the connection is kept alive between runs.
+    # Redirects are followed like requests.get did, httpx doesn't by default
+    if client is not None:
+        response = await client.get(url, headers=SCRAPE_HEADERS, timeout=15, follow_redirects=True)
+    else:
+        async with httpx.AsyncClient(timeout=15) as scrape_client:
+            response = await scrape_client.get(url, headers=SCRAPE_HEADERS, follow_redirects=True)
 
     if response.status_code == 200:
-        soup = BeautifulSoup(response.content, "html.parser")
+        tree = HTMLParser(response.content)
 
         # Find the section containing the articles
-        articles = soup.find_all("div", class_="story-box")  # Adjust class as per the webpage's HTML structure
+        articles = tree.css("div.story-box")  # Adjust class as per the webpage's HTML structure
 
-        news_list = []
+        # One compact "- title: description" line per article, fed straight into the prompt
+        news_lines = []
         for article in articles:
-            title = article.find("h4").get_text(strip=True) if article.find("h4") else "No title"
-            description = article.find("p").get_text(strip=True) if article.find("p") else "No description"
-            news_list.append({"title": title, "description": description})
+            title_node = article.css_first("h4")
+            description_node = article.css_first("p")
+            title = title_node.text(strip=True) if title_node else "No title"
+            description = description_node.text(strip=True) if description_node else "No description"
+            news_lines.append(f"- {title}: {description}")
 
         # Print the scraped news
-        # print(news_list)
-        return news_list
-        
-        # for news in news_list:
-        #     print("Title:", news["title"])
-        #     print("Description:", news["description"])
-        #     print("-" * 80)
+        # print(news_lines)
+        return "\n".join(news_lines)
     else:
         print("Failed to fetch the webpage. Status code:", response.status_code)
 
@@ -100,52 +112,68 @@ def shuffle_options(mcq_list):
     else:
         raise ValueError("Input must be a QuizQuestionList or a list of questions")
 
-    shuffled_questions = []
     for mcq in questions:
-        # Create a copy of the question to avoid modifying the original
-        mcq_copy = mcq.model_copy()
-        # Shuffle the options for each question
-        random.shuffle(mcq_copy.options)
-        shuffled_questions.append(mcq_copy)
+        # Shuffle the options for each question in place, no per-question model copy
+        random.shuffle(mcq.options)
 
-    return shuffled_questions
+    return questions
 
 
-def insert_quiz_questions(questions: Union[QuizQuestionList, List[QuizQuestion]], content: str, supabase_key, supabase_url):
+# Supabase client shared across quiz generations, built on first use
+_supabase: Optional[AsyncClient] = None
+
+async def get_supabase() -> AsyncClient:
+    """
+    Return the cached Supabase client, creating it on the first call
+    """
+    global _supabase
+    if _supabase is None:
+        _supabase = await acreate_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return _supabase
+
+
+async def insert_quiz_questions(questions: Union[QuizQuestionList, List[QuizQuestion]], content: str):
     """
     Convert QuizQuestion objects to a format suitable for Supabase insertion
     """
 
-    # Initialize Supabase client for quiz question storage'
-    url: str = supabase_url
-    key: str = supabase_key
-    client: Client = create_client(url, key)
+    # Supabase client for quiz question storage
+    client: AsyncClient = await get_supabase()
 
     shuffled_mcq_list = shuffle_options(questions)
     for question in shuffled_mcq_list:
         question.metadata = {"content" : content}
-        try:
-            client.table("daily_genai_quiz").insert(question.model_dump()).execute()
-        except Exception as e:
-            print(f"An error occurred: {e}")
+    rows = [question.model_dump() for question in shuffled_mcq_list]
 
+    try:
+        # Insert all questions in a single request
+        await client.table("daily_genai_quiz").insert(rows).execute()
+    except APIError as e:
+        # The server rejected the whole batch, so nothing was written and per-row retries are safe
+        print(f"Batch insert failed, falling back to per-row inserts: {e}")
+        # Fire the per-row inserts concurrently so one failure doesn't sink the rest
+        results = await asyncio.gather(
+            *(client.table("daily_genai_quiz").insert(row).execute() for row in rows),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"An error occurred: {result}")
+    except Exception as e:
+        # Transport errors may hide an already committed batch, retrying would duplicate it
+        print(f"Batch insert failed: {e}")
+        raise
 
-def generate_ai_news_quiz(content: str, num_questions: int, openai_api_key, supabase_key, supabase_url):
-    """
-    Generate AI news quiz using ChatOpenAI with structured output
-    """
-    # Initialize the language model
 
-    os.environ['OPENAI_API_KEY'] = openai_api_key
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7
-    )
+# Output parser for the structured quiz response
+_PARSER = PydanticOutputParser(pydantic_object=QuizQuestionList)
+# Walks the QuizQuestionList JSON schema, so only generate it once
+_FORMAT_INSTRUCTIONS = _PARSER.get_format_instructions()
 
-    # Structured prompt template
-    prompt = PromptTemplate(
-        template=
-        """"Generate {num_questions} context-based multiple-choice quiz questions from the following news content:\n\n{content}\n\n"
+# Structured prompt template, built once at import
+_PROMPT = PromptTemplate(
+    template=
+    """"Generate {num_questions} context-based multiple-choice quiz questions from the following news content:\n\n{content}\n\n"
 
         Guidelines:
 
@@ -202,34 +230,48 @@ def generate_ai_news_quiz(content: str, num_questions: int, openai_api_key, supa
 
         Please ensure the variety and elaboration make the questions engaging and informative."
         {format_instructions}""",
-        input_variables=["content", "num_questions"],
-        partial_variables={
-            "format_instructions": PydanticOutputParser(pydantic_object=QuizQuestionList).get_format_instructions()
-        }
-    )
+    input_variables=["content", "num_questions"],
+    partial_variables={
+        "format_instructions": _FORMAT_INSTRUCTIONS
+    }
+)
+
 
+# prompt | llm | parser chain, built on first use so a missing OpenAI key
+# only fails a quiz run instead of the app import
+_CHAIN = None
+
+def get_quiz_chain():
+    """
+    Return the cached quiz generation chain, creating the language model on the first call
+    """
+    global _CHAIN
+    if _CHAIN is None:
+        llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0.7,
+            openai_api_key=settings.OPENAI_API_KEY
+        )
+        _CHAIN = _PROMPT | llm | _PARSER
+    return _CHAIN
+
+
+async def generate_ai_news_quiz(content: str, num_questions: int):
+    """
+    Generate AI news quiz using ChatOpenAI with structured output
+    """
     try:
-        # Generate all questions in one call
-        chain = prompt | llm | PydanticOutputParser(pydantic_object=QuizQuestionList)
-        quiz_result = chain.invoke({
+        # Generate all questions in one call without blocking the event loop
+        chain = get_quiz_chain()
+        quiz_result: QuizQuestionList = await chain.ainvoke({
             "content": content,
             "num_questions": num_questions
         })
 
-        # Ensure we have a QuizQuestionList or convert the result
-        if isinstance(quiz_result, list):
-            quiz_result = QuizQuestionList(questions=quiz_result)
-
         # Print for debugging
         print(f"Quiz Result Type: {type(quiz_result)}")
         print(f"Questions Count: {len(quiz_result.questions)}")
 
-
-        # Push to Supabase
-        if quiz_result.questions:
-            # quiz_repo = SupabaseQuizRepository()
-            insert_quiz_questions(quiz_result.questions, content, supabase_key, supabase_url)
-
         return quiz_result.questions
 
     except Exception as e: